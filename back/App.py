@@ -1,8 +1,7 @@
 import re  
-from flask import Flask, request, jsonify, send_file, send_from_directory, make_response
-from flask_pymongo import PyMongo
+from flask import Flask, Blueprint, current_app, has_app_context, request, jsonify, send_file, send_from_directory, make_response, Response, stream_with_context
 from bson.objectid import ObjectId
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from datetime import datetime
 import gridfs
 import os
@@ -12,90 +11,74 @@ import requests
 import pytz
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})
+import storage
+from config import Config
+from storage import (
+    get_db, get_fs, get_cache_dir, get_users, salvar_estado_temporario, salvar_imagem, remover_cache_imagem,
+    incrementos_stats, combinar_incrementos, atualizar_stats, reconstruir_stats, formatar_stats, obter_stats,
+    gerar_linhas_exportacao, gerar_arquivo_exportacao
+)
 
-# 🔹 Configuração do MongoDB
-app.config["MONGO_URI"] = "mongodb://localhost:27017/Loqed"
-mongo = PyMongo(app)
-db = mongo.cx["Loqed"]
-#var pra gravura da img no banco
-fs = gridfs.GridFS(db)
+bp = Blueprint("loqed", __name__)
 
+# 🔹 Storage (MongoDB, GridFS e cache) da aplicação atual
+def storage_da_aplicacao():
+    return current_app.extensions.get("storage") if has_app_context() else None
 
-# 🔹 Configuração da API DeepSeek
-DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "sk-48f83f80c7ea485fad3b3d0ae1a82515")  # Defina sua chave
+# 🔹 Fábrica da aplicação
+def create_app(config=None):
+    """Cria a aplicação Flask; as conexões com o MongoDB só abrem no primeiro uso"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
 
-# 🔹 Diretório para cache de imagens
-IMAGE_CACHE_DIR = "cached_images"
-# Criar diretório de cache se não existir
-if not os.path.exists(IMAGE_CACHE_DIR):
-    os.makedirs(IMAGE_CACHE_DIR)
+    if not app.config.get("SECRET_KEY"):
+        raise RuntimeError("Defina a variável de ambiente SECRET_KEY antes de iniciar a aplicação.")
 
-    # 🔹 Gerar e validar tokens seguros
-SECRET_KEY = "DaviKey"
-serializer = URLSafeTimedSerializer(SECRET_KEY)
+    # O Werkzeug recusa com 413 antes de ler o corpo quando o limite é ultrapassado
+    app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_UPLOAD_BYTES"]
+
+    # Cada aplicação tem o seu Storage; os scripts usam o padrão do módulo storage
+    app.extensions["storage"] = storage.Storage(app.config)
+    storage.definir_resolvedor(storage_da_aplicacao)
+
+    CORS(app, resources={r"/*": {"origins": "*"}})
+    app.register_blueprint(bp)
+
+    # Nada de conexão aqui: com gunicorn --preload isto roda antes do fork.
+    # O aquecimento acontece em cada worker (gunicorn.conf.py ou primeiro request).
+    if app.config["WARMUP"]:
+        app.before_request(aquecer_worker)
+
+    return app
+
+def aquecer_worker():
+    """Aquece o Storage da aplicação uma única vez por processo"""
+    try:
+        current_app.extensions["storage"].aquecer()
+    except Exception as e:
+        current_app.logger.warning(f"Falha no aquecimento: {e}")
+
+# 🔹 Gerar e validar tokens seguros
+def obter_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"])
 
 # 🔹 Gerar token temporário seguro
 def gerar_token(image_id, validade=60):
     """Gera um token válido por 5 minutos (300 segundos)"""
-    return serializer.dumps(image_id, salt="image_salt")
+    return obter_serializer().dumps(image_id, salt="image_salt")
 
 # 🔹 Validar token seguro
 def validar_token(token, validade=300):
     """Valida o token e retorna o ID da imagem se for válido"""
     try:
-        return serializer.loads(token, salt="image_salt", max_age=validade)
+        return obter_serializer().loads(token, salt="image_salt", max_age=validade)
     except (SignatureExpired, BadSignature):
         return None
 
-# 🔹 Função para recortar e centralizar imagem
-def recortar_imagem(imagem, tamanho=(400, 400)):
-    """Recorta e redimensiona uma imagem para manter o conteúdo centralizado."""
-    img = Image.open(imagem)
-
-    # Determinar o menor lado para recorte quadrado
-    min_dimensao = min(img.size)
-    img_cortada = img.crop((
-        (img.width - min_dimensao) // 2,
-        (img.height - min_dimensao) // 2,
-        (img.width + min_dimensao) // 2,
-        (img.height + min_dimensao) // 2
-    ))
-
-    # Redimensionar para o tamanho desejado
-    img_cortada = img_cortada.resize(tamanho, Image.LANCZOS)
-
-    # Converter imagem para bytes
-    img_bytes = io.BytesIO()
-    img_cortada.save(img_bytes, format='JPEG')
-    img_bytes.seek(0)
-    return img_bytes
-
-
-# 🔹 Função para formatar datas para "DD/MM/AAAA HH:MM:SS"
-def formatar_data(data):
-    fuso_brasilia = pytz.timezone('America/Sao_Paulo')
-
-    if isinstance(data, datetime):
-        # Adicione o fuso horário explicitamente caso esteja faltando
-        if data.tzinfo is None:
-            data = data.replace(tzinfo=pytz.utc)
-        return data.astimezone(fuso_brasilia).strftime("%d/%m/%Y %H:%M:%S")
-    
-    elif isinstance(data, str):
-        for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d"):
-            try:
-                data = datetime.strptime(data, fmt)
-                data = data.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
-                return data.strftime("%d/%m/%Y %H:%M:%S")
-            except ValueError:
-                continue
-                
-    return "Data inválida"
-
 # 🔹 Função para validar nome
 def validar_nome(nome):
     """Verifica se o nome contém apenas letras e espaços"""
@@ -118,67 +101,19 @@ def validar_data_nascimento(data_str):
     except ValueError:
         return False
 
-# 🔹 Obtém todos os usuários cadastrados e ordena corretamente
-def get_users(order_by="data_nascimento"):
-    users = []
-    for user in db["LoqedBirths"].find():
-        try:
-            data_nascimento = user["data_nascimento"]
-            updated_at = user["updated_at"]
-
-            # Convertendo para datetime se necessário
-            if isinstance(data_nascimento, str):
-                data_nascimento = datetime.strptime(data_nascimento, "%Y-%m-%dT%H:%M:%S") \
-                    if "T" in data_nascimento else datetime.strptime(data_nascimento, "%Y-%m-%d")
-
-            if isinstance(updated_at, str):
-                updated_at = datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S.%f")
-            # Aplicar a conversão de fuso horário para Brasília
-            fuso_brasilia = pytz.timezone('America/Sao_Paulo')
-            data_nascimento = data_nascimento.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
-            updated_at = updated_at.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
-        except Exception as e:
-            print(f"Erro ao processar datas: {e}")
-            continue  # Ignorar usuários com data inválida
-
-        users.append({
-            "id": str(user["_id"]),
-            "nome": user["nome"],
-            "data_nascimento": formatar_data(user["data_nascimento"]),
-            "imagem": user["imagem"],
-            "image_id": user["image_id"],
-            "created_at": formatar_data(user.get("created_at", datetime.utcnow())),
-            "updated_at": formatar_data(user.get("updated_at", datetime.utcnow())),
-            "data_nascimento_obj": data_nascimento,
-            "updated_at_obj": updated_at
-        })
-
-    # 🔹 Ordenação dinâmica corrigida
-    if order_by == "data_nascimento":
-        users = sorted(users, key=lambda x: x["data_nascimento_obj"])
-    elif order_by == "updated_at":
-        users = sorted(users, key=lambda x: x["updated_at_obj"], reverse=True)
-
-    for user in users:
-        del user["data_nascimento_obj"]
-        del user["updated_at_obj"]
-
-    return users
-
-# 🔹 Armazenar o estado temporário (última versão dos dados)
-def salvar_estado_temporario(users):
-    """Salva o estado anterior dos usuários para futura comparação"""
-    db["LoqedBirths_History"].delete_many({})  # Remove o estado temporário anterior
-    db["LoqedBirths_History"].insert_one({"estado_anterior": users})
-
-@app.route('/get_secure_image/<image_id>', methods=['GET'])
+# 🔹 Upload acima do limite configurado
+@bp.app_errorhandler(RequestEntityTooLarge)
+def upload_muito_grande(e):
+    return jsonify({"erro": f"Arquivo muito grande! Tamanho máximo: {current_app.config['MAX_UPLOAD_BYTES'] // (1024 * 1024)} MB."}), 413
+
+@bp.route('/get_secure_image/<image_id>', methods=['GET'])
 def get_secure_image(image_id):
     """Gera uma URL temporária segura para exibir imagens"""
     token = gerar_token(image_id)
     secure_url = f"{request.host_url}secure_image/{token}"
     return jsonify({"secure_url": secure_url})
 
-@app.route('/secure_image/<token>', methods=['GET'])
+@bp.route('/secure_image/<token>', methods=['GET'])
 def secure_image(token):
     """Valida token e carrega a imagem apenas se válido"""
     image_id = validar_token(token)
@@ -186,13 +121,13 @@ def secure_image(token):
         return jsonify({"erro": "Token inválido ou expirado"}), 403
 
     # Buscar imagem via GridFS ou cache
-    cache_path = os.path.join(IMAGE_CACHE_DIR, f"{image_id}.jpg")
+    cache_path = os.path.join(get_cache_dir(), f"{image_id}.jpg")
     if os.path.exists(cache_path):
         with open(cache_path, "rb") as image_file:
             return send_file(io.BytesIO(image_file.read()), mimetype='image/jpeg')
 
     try:
-        image_file = fs.get(ObjectId(image_id))
+        image_file = get_fs().get(ObjectId(image_id))
         with open(cache_path, "wb") as f:
             f.write(image_file.read())
         return send_file(io.BytesIO(image_file.read()), mimetype='image/jpeg')
@@ -202,7 +137,7 @@ def secure_image(token):
 
 
 # 🔹 Criar usuário
-@app.route('/add_user', methods=['POST'])
+@bp.route('/add_user', methods=['POST'])
 def add_user():
     """Adiciona um novo usuário ao MongoDB"""
     nome = request.form.get('nome')
@@ -219,19 +154,17 @@ def add_user():
         return jsonify({"erro": "Data de nascimento inválida! A data deve ser coerente."}), 400
     
     # 🔹 Verificar se o nome já existe
-    if db["LoqedBirths"].find_one({"nome": nome}):
+    if get_db()["LoqedBirths"].find_one({"nome": nome}):
         return jsonify({"erro": "Nome já cadastrado!"}), 400
     
-    imagem_recortada = recortar_imagem(imagem)
     filename = f"{nome.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
 
     try:
-        img_id = fs.put(imagem_recortada, filename=filename, content_type=imagem.content_type or 'image/jpeg')
+        img_id = salvar_imagem(imagem, filename)
+    except (ValueError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        return jsonify({"erro": f"Imagem inválida: {str(e)}"}), 400
     except Exception as e:
         return jsonify({"erro": f"Erro ao salvar imagem: {str(e)}"}), 500
-    cache_path = os.path.join(IMAGE_CACHE_DIR, filename)
-    with open(cache_path, "wb") as f:
-        f.write(imagem_recortada.getvalue())
     user = {
         "nome": nome,
         "data_nascimento": data_nascimento,
@@ -241,19 +174,54 @@ def add_user():
         "updated_at": datetime.utcnow().replace(tzinfo=pytz.utc)
     }
 
-    result = db["LoqedBirths"].insert_one(user)
+    result = get_db()["LoqedBirths"].insert_one(user)
+    atualizar_stats(incrementos_stats(data_nascimento))
     return jsonify({"mensagem": "Usuário cadastrado!", "id": str(result.inserted_id), "imagem": filename}), 201
 
 # 🔹 Listar usuários
-@app.route('/get_users', methods=['GET'])
+@bp.route('/get_users', methods=['GET'])
 def get_users_route():
     return jsonify(get_users())
 
+# 🔹 Exportar usuários (NDJSON, CSV ou .tar com imagens)
+@bp.route('/export', methods=['GET'])
+def export_users():
+    """Exporta os usuários em streaming direto do cursor do MongoDB"""
+    formato = request.args.get('formato', 'ndjson').lower()
+    imagens = request.args.get('imagens', '').lower()
+
+    if formato not in ("ndjson", "csv"):
+        return jsonify({"erro": "Formato inválido! Use 'ndjson' ou 'csv'."}), 400
+    if imagens not in ("", "hash", "bytes"):
+        return jsonify({"erro": "Opção de imagens inválida! Use 'hash' ou 'bytes'."}), 400
+
+    if imagens == "bytes":
+        conteudo, mimetype, extensao = gerar_arquivo_exportacao(formato), "application/x-tar", "tar"
+    elif formato == "csv":
+        conteudo, mimetype, extensao = gerar_linhas_exportacao("csv", imagens == "hash"), "text/csv", "csv"
+    else:
+        conteudo, mimetype, extensao = gerar_linhas_exportacao("ndjson", imagens == "hash"), "application/x-ndjson", "ndjson"
+
+    response = Response(stream_with_context(conteudo), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=usuarios.{extensao}"
+    response.headers["X-Accel-Buffering"] = "no"  # Evita que proxies segurem o stream
+    return response
+
+# 🔹 Estatísticas pré-calculadas
+@bp.route('/stats', methods=['GET'])
+def stats_route():
+    return jsonify(obter_stats())
+
+@bp.route('/stats/rebuild', methods=['POST'])
+def rebuild_stats_route():
+    """Recalcula as estatísticas do zero (reparo)"""
+    return jsonify(formatar_stats(reconstruir_stats(forcar=True)))
+
 # 🔹 Atualizar usuário
-@app.route('/update_user/<user_id>', methods=['PUT'])
+@bp.route('/update_user/<user_id>', methods=['PUT'])
 def update_user(user_id):
     """Atualiza um usuário no MongoDB"""
-    user = db["LoqedBirths"].find_one({"_id": ObjectId(user_id)})
+    user = get_db()["LoqedBirths"].find_one({"_id": ObjectId(user_id)})
     if not user:
         return jsonify({"erro": "Usuário não encontrado"}), 404
 
@@ -272,7 +240,7 @@ def update_user(user_id):
         return jsonify({"erro": "Data de nascimento inválida! A data deve ser coerente."}), 400
 
     # 🔹 Verificar se o novo nome já existe (exceto se for o próprio usuário)
-    if nome != user["nome"] and db["LoqedBirths"].find_one({"nome": nome}):
+    if nome != user["nome"] and get_db()["LoqedBirths"].find_one({"nome": nome}):
         return jsonify({"erro": "Nome já cadastrado!"}), 400
     
    
@@ -286,45 +254,59 @@ def update_user(user_id):
     if imagem:
         filename = f"{nome.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
         try:
-            new_img_id = fs.put(imagem, filename=filename, content_type=imagem.content_type)
+            new_img_id = salvar_imagem(imagem, filename)
+        except (ValueError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+            return jsonify({"erro": f"Imagem inválida: {str(e)}"}), 400
+        except Exception as e:
+            return jsonify({"erro": f"Erro ao salvar nova imagem: {str(e)}"}), 500
+
+        try:
             if "image_id" in user:
-                fs.delete(ObjectId(user["image_id"]))
+                get_fs().delete(ObjectId(user["image_id"]))
+
+            # Remove também a imagem antiga do cache para não deixar arquivo órfão
+            remover_cache_imagem(user)
+
             update_data["imagem"] = filename
             update_data["image_id"] = str(new_img_id)
         except Exception as e:
             return jsonify({"erro": f"Erro ao salvar nova imagem: {str(e)}"}), 500
 
-    db["LoqedBirths"].update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
+    get_db()["LoqedBirths"].update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
+    if data_nascimento != user["data_nascimento"]:
+        atualizar_stats(combinar_incrementos(
+            incrementos_stats(user["data_nascimento"], -1),
+            incrementos_stats(data_nascimento)
+        ))
     return jsonify({"mensagem": "Usuário atualizado!"})
 
 # 🔹 Deletar usuário
-@app.route('/delete_user/<user_id>', methods=['DELETE'])
+@bp.route('/delete_user/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """Remove um usuário do MongoDB e sua imagem associada"""
-    user = db["LoqedBirths"].find_one({"_id": ObjectId(user_id)})
+    user = get_db()["LoqedBirths"].find_one({"_id": ObjectId(user_id)})
     if not user:
         return jsonify({"erro": "Usuário não encontrado"}), 404
 
-     # 🔹 Verificar e remover imagem do cache
-    if "imagem" in user:
-        cache_path = os.path.join(IMAGE_CACHE_DIR, user["imagem"])
-        if os.path.exists(cache_path):
-            try:
-                os.remove(cache_path)
-            except Exception as e:
-                return jsonify({"erro": f"Erro ao remover imagem do cache: {str(e)}"}), 500
+    # 🔹 Verificar e remover imagem do cache
+    try:
+        remover_cache_imagem(user)
+    except Exception as e:
+        return jsonify({"erro": f"Erro ao remover imagem do cache: {str(e)}"}), 500
 
     # 🔹 Verificar e remover imagem do banco (GridFS)
     if "image_id" in user:
         try:
-            fs.delete(ObjectId(user["image_id"]))
+            get_fs().delete(ObjectId(user["image_id"]))
         except gridfs.errors.NoFile:
             pass  # Se não existir no GridFS, ignora sem erro
         except Exception as e:
             return jsonify({"erro": f"Erro ao remover imagem do banco: {str(e)}"}), 500
 
     # 🔹 Remover o usuário do banco
-    db["LoqedBirths"].delete_one({"_id": ObjectId(user_id)})
+    result = get_db()["LoqedBirths"].delete_one({"_id": ObjectId(user_id)})
+    if result.deleted_count:
+        atualizar_stats(incrementos_stats(user.get("data_nascimento"), -1))
     return jsonify({"mensagem": "Usuário e imagem deletados com sucesso!"}), 200
 
 # # 🔹 Servir imagens do cache
@@ -355,18 +337,18 @@ def delete_user(user_id):
 #     except Exception as e:
 #         return jsonify({"erro": f"Erro ao buscar imagem: {str(e)}"}), 500
 
-@app.route('/load_image/<image_id>', methods=['GET'])
+@bp.route('/load_image/<image_id>', methods=['GET'])
 def load_image(image_id):
     """Envia a imagem diretamente via bytes"""
     try:
         # Tenta localizar a imagem no cache local
-        cache_path = os.path.join(IMAGE_CACHE_DIR, f"{image_id}.jpg")
+        cache_path = os.path.join(get_cache_dir(), f"{image_id}.jpg")
         if os.path.exists(cache_path):
             with open(cache_path, "rb") as image_file:
                 return send_file(io.BytesIO(image_file.read()), mimetype='image/jpeg')
 
         # Se não estiver no cache, buscar do banco e armazenar no cache
-        image_file = fs.get(ObjectId(image_id))
+        image_file = get_fs().get(ObjectId(image_id))
         with open(cache_path, "wb") as f:
             f.write(image_file.read())
 
@@ -380,8 +362,15 @@ def load_image(image_id):
 
 
 
+# 🔹 Perguntas que as estatísticas pré-calculadas respondem sozinhas
+TERMOS_AGREGADOS = ("quantos", "quantas", "quantidade", "total", "média", "media", "distribuição", "distribuicao", "faixa", "por mês", "por mes", "cada mês", "cada mes")
+
+def pergunta_agregada(question):
+    """Verifica se a pergunta é sobre contagens/médias (e não sobre pessoas específicas)"""
+    return any(termo in question for termo in TERMOS_AGREGADOS)
+
 # 🔹 Oráculo (IA responde com base nos usuários)
-@app.route('/oracle', methods=['POST'])
+@bp.route('/oracle', methods=['POST'])
 def oracle():
     data = request.json
     question = data.get("question", "").strip().lower()
@@ -389,28 +378,43 @@ def oracle():
     if not question:
         return jsonify({"erro": "A pergunta não pode estar vazia"}), 400
 
-    order_by = "updated_at" if "atualização" in question else "data_nascimento"
-    users = get_users(order_by)
-
-# 🔹 Buscar o estado anterior (estado temporário)
-    estado_anterior = db["LoqedBirths_History"].find_one()
-    estado_anterior = estado_anterior.get("estado_anterior", [])
+    if not current_app.config.get("DEEPSEEK_API_KEY"):
+        return jsonify({"erro": "Oráculo indisponível: defina a variável de ambiente DEEPSEEK_API_KEY."}), 503
+
+    system = {"role": "system", "content": "Você é um assistente de análise de dados. Use resposta na linguagem tradicional/comum. Nunca mostre qualquer id nas respostas nome da campos ou qualquer informação sensível."}
+
+    if pergunta_agregada(question):
+        # 🔹 Perguntas agregadas: só as estatísticas pré-calculadas, sem varrer os usuários
+        users = obter_stats()
+        messages = [
+            system,
+            {"role": "user", "content": f"Estatísticas dos usuários:\n\n{json.dumps(users, indent=2, ensure_ascii=False)}\n\n{question}"}
+        ]
+    else:
+        # Perguntas sobre pessoas específicas precisam da lista completa
+        order_by = "updated_at" if "atualização" in question else "data_nascimento"
+        users = get_users(order_by)
+
+        # 🔹 Buscar o estado anterior (estado temporário)
+        estado_anterior = get_db()["LoqedBirths_History"].find_one() or {}
+        estado_anterior = estado_anterior.get("estado_anterior", [])
+        messages = [
+            system,
+            {"role": "user", "content": f"Usuários antes da atualização:\n\n{json.dumps(estado_anterior, indent=2, ensure_ascii=False)}\n\n"},
+            {"role": "user", "content": f"Usuários atuais:\n\n{json.dumps(users, indent=2, ensure_ascii=False)}\n\n{question}"}
+        ]
 
     prompt = {
         "model": "deepseek-chat",
-        "messages": [
-            {"role": "system", "content": "Você é um assistente de análise de dados. Use resposta na linguagem tradicional/comum. Nunca mostre qualquer id nas respostas nome da campos ou qualquer informação sensível."},
-            {"role": "user", "content": f"Usuários antes da atualização:\n\n{json.dumps(estado_anterior, indent=2, ensure_ascii=False)}\n\n"},
-            {"role": "user", "content": f"Usuários atuais:\n\n{json.dumps(users, indent=2, ensure_ascii=False)}\n\n{question}"}
-        ],
+        "messages": messages,
         "max_tokens": 1000,
         "temperature": 0.2
     }
 
-    headers = {"Authorization": f"Bearer {DEEPSEEK_API_KEY}", "Content-Type": "application/json"}
+    headers = {"Authorization": f"Bearer {current_app.config['DEEPSEEK_API_KEY']}", "Content-Type": "application/json"}
 
     try:
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=prompt)
+        response = requests.post(current_app.config["DEEPSEEK_API_URL"], headers=headers, json=prompt)
 
         # Se a resposta estiver vazia, registrar o erro
         if response.status_code != 200:
@@ -429,4 +433,4 @@ def oracle():
         return jsonify({"erro": f"Erro de conexão com a API DeepSeek: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    app.run(debug=True,host='0.0.0.0',port=8080)
\ No newline at end of file
+    create_app().run(debug=True,host='0.0.0.0',port=8080)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import os
+
+# 🔹 Configurações da aplicação (todas podem ser definidas por variáveis de ambiente)
+class Config:
+    # MongoDB
+    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/Loqed")
+    MONGO_DB = os.getenv("MONGO_DB", "Loqed")  # Só usado quando a MONGO_URI não indica o banco
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))  # Conexões máximas por processo
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))  # Conexões mantidas abertas
+    MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", 5000))  # Tempo máximo para achar o servidor
+
+    # Diretório para cache de imagens
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "cached_images")
+
+    # Tokens seguros das imagens (obrigatória: create_app falha sem ela)
+    SECRET_KEY = os.getenv("SECRET_KEY")
+
+    # API DeepSeek
+    DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
+    DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")  # Sem ela, o Oráculo responde com erro
+
+    # Limites de upload de imagens
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))  # Tamanho máximo da requisição
+    MAX_IMAGE_DIMENSAO = int(os.getenv("MAX_IMAGE_DIMENSAO", 8000))  # Lado máximo (px), lido do cabeçalho
+    MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", 24_000_000))  # Pixels decodificados (~72 MB em RGB); cobre fotos de 12-24 MP
+
+    # Exportação em streaming
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))  # Documentos por lote lidos do cursor
+
+    # Aquecimento de cada worker (conexão, índices, estatísticas e cache de imagens)
+    WARMUP = os.getenv("WARMUP", "0").lower() in ("1", "true", "sim")
+    WARMUP_IMAGENS = int(os.getenv("WARMUP_IMAGENS", 200))  # Imagens copiadas para o cache em segundo plano (0 = nenhuma)
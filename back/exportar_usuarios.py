@@ -0,0 +1,32 @@
+import argparse
+import sys
+
+from storage import gerar_linhas_exportacao, gerar_arquivo_exportacao  # Mesmos geradores da rota /export
+
+# Função para exportar os usuários em streaming
+def exportar_usuarios(formato="ndjson", imagens="", saida=None):
+    if imagens == "bytes":
+        # Arquivo .tar com as imagens e os dados no formato escolhido (binário)
+        destino = open(saida, "wb") if saida else sys.stdout.buffer
+        conteudo = gerar_arquivo_exportacao(formato)
+    else:
+        destino = open(saida, "w", encoding="utf-8", newline="") if saida else sys.stdout
+        conteudo = gerar_linhas_exportacao(formato, incluir_hash=imagens == "hash")
+
+    try:
+        for bloco in conteudo:
+            destino.write(bloco)
+    finally:
+        if saida:
+            destino.close()
+        else:
+            destino.flush()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta os usuários cadastrados em streaming")
+    parser.add_argument("--formato", choices=["ndjson", "csv"], default="ndjson", help="Formato das linhas exportadas")
+    parser.add_argument("--imagens", choices=["hash", "bytes"], default="", help="Inclui o hash das imagens ou um .tar com as imagens")
+    parser.add_argument("--saida", help="Arquivo de destino (padrão: saída padrão)")
+    args = parser.parse_args()
+
+    exportar_usuarios(args.formato, args.imagens, args.saida)
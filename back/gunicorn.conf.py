@@ -0,0 +1,12 @@
+# 🔹 Configuração do gunicorn: gunicorn -c gunicorn.conf.py "App:create_app()"
+bind = "0.0.0.0:8080"
+
+# Aquecimento em cada worker, depois do fork (o MongoClient não é fork-safe).
+# Falhas são só registradas: o worker sobe mesmo com o MongoDB fora do ar e tenta de novo depois.
+def post_worker_init(worker):
+    from App import aquecer_worker
+
+    app = worker.wsgi
+    if app.config.get("WARMUP"):
+        with app.app_context():
+            aquecer_worker()
@@ -1,14 +1,9 @@
 from PIL import Image
-from flask_pymongo import PyMongo
 from bson.objectid import ObjectId
-import gridfs
 import os
 import io
 
-from App import db, fs  # Importando MongoDB e GridFS já configurados
-
-# Caminho da pasta de cache
-IMAGE_CACHE_DIR = "cached_images"
+from storage import get_db, get_fs, get_cache_dir, remover_cache_imagem  # Camada de dados, sem carregar a aplicação web
 
 # Função para recortar imagem
 def recortar_imagem(imagem, tamanho=(400, 400)):
@@ -34,6 +29,9 @@ def recortar_imagem(imagem, tamanho=(400, 400)):
 def atualizar_imagens_antigas():
     print("🔄 Iniciando a atualização das imagens antigas...")
 
+    db = get_db()
+    fs = get_fs()
+
     # Buscar todas as imagens já existentes
     usuarios = db["LoqedBirths"].find()
 
@@ -53,8 +51,9 @@ def atualizar_imagens_antigas():
                 # Atualizar ID da nova imagem no banco
                 db["LoqedBirths"].update_one({"_id": user["_id"]}, {"$set": {"image_id": str(new_img_id)}})
 
-                # Atualizar imagem no cache
-                cache_path = os.path.join(IMAGE_CACHE_DIR, user["imagem"])
+                # Atualizar imagem no cache (mesmo nome lido pelas rotas: <image_id>.jpg)
+                remover_cache_imagem(user)
+                cache_path = os.path.join(get_cache_dir(), f"{new_img_id}.jpg")
                 with open(cache_path, "wb") as f:
                     f.write(imagem_recortada.getvalue())
 
@@ -0,0 +1,615 @@
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from PIL import Image
+from datetime import datetime, date
+import gridfs
+import os
+import io
+import csv
+import json
+import hashlib
+import tarfile
+import tempfile
+import calendar
+import time
+import threading
+import shutil
+import pytz
+
+from config import Config
+
+# 🔹 Configurações usadas pela camada de dados
+CHAVES_STORAGE = (
+    "MONGO_URI", "MONGO_DB", "MONGO_MAX_POOL_SIZE", "MONGO_MIN_POOL_SIZE", "MONGO_TIMEOUT_MS",
+    "IMAGE_CACHE_DIR", "MAX_IMAGE_DIMENSAO", "MAX_IMAGE_PIXELS", "EXPORT_BATCH_SIZE", "WARMUP_IMAGENS"
+)
+
+# 🔹 Exportação em streaming
+EXPORT_CHUNK_SIZE = 64 * 1024  # Tamanho dos blocos lidos do GridFS
+EXPORT_SPOOL_SIZE = 1024 * 1024  # Acima disso os dados do .tar vão para disco, não para a memória
+EXPORT_CAMPOS = ["id", "nome", "data_nascimento", "imagem", "image_id", "created_at", "updated_at"]
+
+# 🔹 Estatísticas pré-calculadas (mantidas com $inc a cada escrita)
+STATS_COLLECTION = "LoqedBirths_Stats"
+STATS_ID = "geral"
+STATS_VERSAO = 2  # Documentos de outra versão são reconstruídos em vez de incrementados
+FAIXA_ETARIA = 10  # Largura (em anos) das faixas da distribuição de idade
+DATA_EPOCH = date(1970, 1, 1)
+
+# 🔹 Aquecimento
+AQUECIMENTO_NOVA_TENTATIVA = 30  # Segundos de espera antes de tentar de novo depois de uma falha
+
+# 🔹 Conexões abertas sob demanda (nada é feito ao criar o objeto)
+class Storage:
+    """MongoClient, GridFS e cache de imagens de uma aplicação (ou de um script)"""
+    def __init__(self, opcoes=None):
+        opcoes = opcoes or {}
+        self.config = {chave: opcoes.get(chave, getattr(Config, chave)) for chave in CHAVES_STORAGE}
+        self._lock = threading.Lock()
+        self._client = None
+        self._fs = None
+        self._cache_pronto = False
+        self._aquecido = False
+        self._proxima_tentativa = 0
+        self._lock_aquecimento = threading.Lock()
+
+    def client(self):
+        """Cria o MongoClient no primeiro uso, com o pool configurado"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = MongoClient(
+                        self.config["MONGO_URI"],
+                        maxPoolSize=self.config["MONGO_MAX_POOL_SIZE"],
+                        minPoolSize=self.config["MONGO_MIN_POOL_SIZE"],
+                        serverSelectionTimeoutMS=self.config["MONGO_TIMEOUT_MS"],
+                        connect=False
+                    )
+        return self._client
+
+    def db(self):
+        # O banco da MONGO_URI tem prioridade; MONGO_DB só vale se a URI não indicar um
+        return self.client().get_default_database(self.config["MONGO_DB"])
+
+    # GridFS para gravar as imagens no banco
+    def fs(self):
+        if self._fs is None:
+            self._fs = gridfs.GridFS(self.db())
+        return self._fs
+
+    def cache_dir(self):
+        """Cria o diretório de cache na primeira vez que ele é usado"""
+        if not self._cache_pronto:
+            os.makedirs(self.config["IMAGE_CACHE_DIR"], exist_ok=True)
+            self._cache_pronto = True
+        return self.config["IMAGE_CACHE_DIR"]
+
+    def aquecer(self):
+        """Executa o aquecimento até dar certo uma vez (deve rodar depois do fork do worker)
+
+        Se falhar (MongoDB fora do ar, por exemplo), a exceção sobe para quem chamou e
+        uma nova tentativa só acontece depois de AQUECIMENTO_NOVA_TENTATIVA segundos.
+        """
+        if self._aquecido or time.monotonic() < self._proxima_tentativa:
+            return
+        with self._lock_aquecimento:
+            if self._aquecido or time.monotonic() < self._proxima_tentativa:
+                return
+            try:
+                aquecer(self)
+            except Exception:
+                self._proxima_tentativa = time.monotonic() + AQUECIMENTO_NOVA_TENTATIVA
+                raise
+            self._aquecido = True
+
+    def fechar(self):
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._fs = None
+
+# 🔹 Storage em uso: o da aplicação Flask atual ou, fora dela (scripts), o padrão do processo
+_resolvedor = None
+_padrao = None
+_padrao_lock = threading.Lock()
+
+def definir_resolvedor(funcao):
+    """Registra a função que devolve o Storage da aplicação atual (ou None)"""
+    global _resolvedor
+    _resolvedor = funcao
+
+def get_storage():
+    global _padrao
+    if _resolvedor is not None:
+        atual = _resolvedor()
+        if atual is not None:
+            return atual
+    if _padrao is None:
+        with _padrao_lock:
+            if _padrao is None:
+                _padrao = Storage()
+    return _padrao
+
+def get_client():
+    return get_storage().client()
+
+def get_db():
+    return get_storage().db()
+
+def get_fs():
+    return get_storage().fs()
+
+# 🔹 Diretório para cache de imagens
+def get_cache_dir():
+    return get_storage().cache_dir()
+
+# 🔹 Abrir imagem validando apenas o cabeçalho
+def abrir_imagem_limitada(imagem, tamanho=(400, 400)):
+    """Abre a imagem sem decodificá-la e recusa dimensões acima do limite"""
+    config = get_storage().config
+    img = Image.open(imagem)  # Lazy: aqui só o cabeçalho é lido
+
+    if max(img.size) > config["MAX_IMAGE_DIMENSAO"]:
+        raise ValueError(f"Imagem muito grande! Dimensão máxima: {config['MAX_IMAGE_DIMENSAO']}px.")
+
+    # Em JPEG, decodifica já reduzido (1/2, 1/4 ou 1/8) mantendo pelo menos o tamanho final
+    img.draft("RGB", tamanho)
+
+    # PNG, WebP etc. não são reduzidos pelo draft: limita os pixels que serão decodificados
+    if img.width * img.height > config["MAX_IMAGE_PIXELS"]:
+        raise ValueError(f"Imagem muito grande! Máximo de {config['MAX_IMAGE_PIXELS'] // 1_000_000} megapixels.")
+    return img
+
+# 🔹 Função para recortar e centralizar imagem
+def recortar_imagem(imagem, tamanho=(400, 400)):
+    """Recorta e redimensiona uma imagem para manter o conteúdo centralizado."""
+    img = abrir_imagem_limitada(imagem, tamanho)
+
+    # Determinar o menor lado para recorte quadrado
+    min_dimensao = min(img.size)
+    img_cortada = img.crop((
+        (img.width - min_dimensao) // 2,
+        (img.height - min_dimensao) // 2,
+        (img.width + min_dimensao) // 2,
+        (img.height + min_dimensao) // 2
+    ))
+
+    # Redimensionar para o tamanho desejado
+    img_cortada = img_cortada.resize(tamanho, Image.LANCZOS)
+
+    # JPEG não aceita transparência nem paleta
+    if img_cortada.mode != "RGB":
+        img_cortada = img_cortada.convert("RGB")
+    return img_cortada
+
+# 🔹 Gravar o mesmo fluxo de bytes em vários destinos
+class GravadorDuplo:
+    """Repassa cada bloco escrito para todos os destinos (GridFS e cache)"""
+    def __init__(self, *destinos):
+        self.destinos = destinos
+
+    def write(self, dados):
+        for destino in self.destinos:
+            destino.write(dados)
+        return len(dados)
+
+    def flush(self):
+        pass
+
+# 🔹 Salvar imagem no GridFS e no cache em uma única passada
+def salvar_imagem(imagem, filename, tamanho=(400, 400)):
+    """Processa o upload e grava o JPEG em blocos no GridFS e no cache ao mesmo tempo"""
+    try:
+        img = recortar_imagem(imagem, tamanho)
+    except OSError as e:
+        # Arquivo não reconhecido, truncado ou corrompido (erro do cliente, não do servidor)
+        raise ValueError(f"Arquivo de imagem inválido ou corrompido: {e}") from e
+
+    # O cache usa o id do GridFS (já conhecido antes de gravar), o mesmo nome que as rotas leem
+    arquivo_gridfs = get_fs().new_file(filename=filename, content_type='image/jpeg')
+    cache_path = os.path.join(get_cache_dir(), f"{arquivo_gridfs._id}.jpg")
+
+    try:
+        with open(cache_path, "wb") as cache:
+            img.save(GravadorDuplo(arquivo_gridfs, cache), format='JPEG')
+        arquivo_gridfs.close()
+    except Exception:
+        # Não deixa chunks órfãos no GridFS nem arquivo parcial no cache
+        arquivo_gridfs.abort()
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        raise
+
+    return arquivo_gridfs._id
+
+# 🔹 Remover as cópias de uma imagem do cache
+def remover_cache_imagem(user):
+    """Apaga o arquivo pelo image_id (nome lido pelas rotas) e pelo nome antigo do upload"""
+    nomes = []
+    if user.get("image_id"):
+        nomes.append(f"{user['image_id']}.jpg")
+    if user.get("imagem"):
+        nomes.append(user["imagem"])
+
+    for nome in nomes:
+        cache_path = os.path.join(get_cache_dir(), nome)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+# 🔹 Função para formatar datas para "DD/MM/AAAA HH:MM:SS"
+def formatar_data(data):
+    fuso_brasilia = pytz.timezone('America/Sao_Paulo')
+
+    if isinstance(data, datetime):
+        # Adicione o fuso horário explicitamente caso esteja faltando
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=pytz.utc)
+        return data.astimezone(fuso_brasilia).strftime("%d/%m/%Y %H:%M:%S")
+    
+    elif isinstance(data, str):
+        for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d"):
+            try:
+                data = datetime.strptime(data, fmt)
+                data = data.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
+                return data.strftime("%d/%m/%Y %H:%M:%S")
+            except ValueError:
+                continue
+                
+    return "Data inválida"
+
+# 🔹 Obtém todos os usuários cadastrados e ordena corretamente
+def get_users(order_by="data_nascimento"):
+    users = []
+    for user in get_db()["LoqedBirths"].find():
+        try:
+            data_nascimento = user["data_nascimento"]
+            updated_at = user["updated_at"]
+
+            # Convertendo para datetime se necessário
+            if isinstance(data_nascimento, str):
+                data_nascimento = datetime.strptime(data_nascimento, "%Y-%m-%dT%H:%M:%S") \
+                    if "T" in data_nascimento else datetime.strptime(data_nascimento, "%Y-%m-%d")
+
+            if isinstance(updated_at, str):
+                updated_at = datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S.%f")
+            # Aplicar a conversão de fuso horário para Brasília
+            fuso_brasilia = pytz.timezone('America/Sao_Paulo')
+            data_nascimento = data_nascimento.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
+            updated_at = updated_at.replace(tzinfo=pytz.utc).astimezone(fuso_brasilia)
+        except Exception as e:
+            print(f"Erro ao processar datas: {e}")
+            continue  # Ignorar usuários com data inválida
+
+        users.append({
+            "id": str(user["_id"]),
+            "nome": user["nome"],
+            "data_nascimento": formatar_data(user["data_nascimento"]),
+            "imagem": user["imagem"],
+            "image_id": user["image_id"],
+            "created_at": formatar_data(user.get("created_at", datetime.utcnow())),
+            "updated_at": formatar_data(user.get("updated_at", datetime.utcnow())),
+            "data_nascimento_obj": data_nascimento,
+            "updated_at_obj": updated_at
+        })
+
+    # 🔹 Ordenação dinâmica corrigida
+    if order_by == "data_nascimento":
+        users = sorted(users, key=lambda x: x["data_nascimento_obj"])
+    elif order_by == "updated_at":
+        users = sorted(users, key=lambda x: x["updated_at_obj"], reverse=True)
+
+    for user in users:
+        del user["data_nascimento_obj"]
+        del user["updated_at_obj"]
+
+    return users
+
+# 🔹 Armazenar o estado temporário (última versão dos dados)
+def salvar_estado_temporario(users):
+    """Salva o estado anterior dos usuários para futura comparação"""
+    get_db()["LoqedBirths_History"].delete_many({})  # Remove o estado temporário anterior
+    get_db()["LoqedBirths_History"].insert_one({"estado_anterior": users})
+
+# 🔹 Converter data de nascimento (string ou datetime) para date
+def converter_data_nascimento(valor):
+    """Retorna a data de nascimento como date, ou None se for inválida"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, str):
+        try:
+            return datetime.strptime(valor[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
+
+# 🔹 Incrementos das estatísticas para uma data de nascimento
+def incrementos_stats(data_nascimento, sinal=1):
+    """Monta o $inc que adiciona (sinal=1) ou remove (sinal=-1) um usuário das estatísticas"""
+    data = converter_data_nascimento(data_nascimento)
+    if data is None:
+        return {}
+    return {
+        "total": sinal,
+        f"por_mes.{data.month:02d}": sinal,
+        f"por_ano_mes.{data.year}-{data.month:02d}": sinal,
+        "soma_dias_nascimento": sinal * (data - DATA_EPOCH).days
+    }
+
+def combinar_incrementos(*grupos):
+    """Soma vários $inc em um só (o MongoDB não aceita o mesmo campo duas vezes)"""
+    combinado = {}
+    for grupo in grupos:
+        for campo, valor in grupo.items():
+            combinado[campo] = combinado.get(campo, 0) + valor
+    return combinado
+
+def atualizar_stats(incrementos):
+    """Aplica os incrementos de forma atômica no documento de estatísticas
+
+    Chamada depois da escrita do usuário. O caminho de escrita nunca cria o documento:
+    sem upsert, um $inc criaria contadores parciais. Enquanto ele não existe (ou é de
+    outra versão), os incrementos são ignorados; a reconstrução conta o usuário.
+    """
+    if incrementos:
+        get_db()[STATS_COLLECTION].update_one({"_id": STATS_ID, "versao": STATS_VERSAO}, {"$inc": incrementos})
+
+# 🔹 Reconstruir estatísticas do zero (reparo)
+def reconstruir_stats(forcar=False):
+    """Recalcula as estatísticas com uma agregação sobre todos os usuários
+
+    Sem forcar (aquecimento e leitura de /stats), só grava se o documento não existir
+    ou for de outra versão: quem chegar depois não sobrescreve o que já foi criado.
+    Com forcar (POST /stats/rebuild), substitui o documento. Escritas feitas durante a
+    agregação podem ficar fora da contagem ou, no reparo forçado, ser contadas duas
+    vezes; nesse caso basta rodar /stats/rebuild de novo com o sistema parado.
+    """
+    pipeline = [
+        {"$project": {"nascimento": {"$cond": [
+            {"$eq": [{"$type": "$data_nascimento"}, "date"]},
+            "$data_nascimento",
+            {"$dateFromString": {
+                "dateString": {"$substrCP": [{"$ifNull": ["$data_nascimento", ""]}, 0, 10]},
+                "format": "%Y-%m-%d",
+                "onError": None,
+                "onNull": None
+            }}
+        ]}}},
+        {"$match": {"nascimento": {"$ne": None}}},
+        {"$facet": {
+            "por_mes": [{"$group": {"_id": {"$month": "$nascimento"}, "total": {"$sum": 1}}}],
+            "por_ano_mes": [{"$group": {
+                "_id": {"ano": {"$year": "$nascimento"}, "mes": {"$month": "$nascimento"}},
+                "total": {"$sum": 1}
+            }}],
+            "geral": [{"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "soma_dias_nascimento": {"$sum": {"$floor": {"$divide": [{"$toLong": "$nascimento"}, 86400000]}}}
+            }}]
+        }}
+    ]
+    resultado = next(get_db()["LoqedBirths"].aggregate(pipeline), {})
+    geral = (resultado.get("geral") or [{}])[0]
+
+    stats = {
+        "_id": STATS_ID,
+        "versao": STATS_VERSAO,
+        "total": geral.get("total", 0),
+        "por_mes": {f"{item['_id']:02d}": item["total"] for item in resultado.get("por_mes", [])},
+        "por_ano_mes": {
+            f"{item['_id']['ano']}-{item['_id']['mes']:02d}": item["total"] for item in resultado.get("por_ano_mes", [])
+        },
+        "soma_dias_nascimento": int(geral.get("soma_dias_nascimento", 0))
+    }
+    colecao = get_db()[STATS_COLLECTION]
+    if forcar:
+        colecao.replace_one({"_id": STATS_ID}, stats, upsert=True)
+        return stats
+
+    try:
+        colecao.replace_one({"_id": STATS_ID, "versao": {"$ne": STATS_VERSAO}}, stats, upsert=True)
+    except DuplicateKeyError:
+        # Outro processo já criou o documento atual; ele é que vale
+        return colecao.find_one({"_id": STATS_ID})
+    return stats
+
+# 🔹 Formatar estatísticas para resposta
+def formatar_stats(stats):
+    """Deriva idade média e distribuição de idades a partir dos contadores"""
+    hoje = datetime.utcnow().date()
+    total = stats.get("total", 0)
+
+    idade_media = None
+    if total > 0:
+        dias_medios = (hoje - DATA_EPOCH).days - stats.get("soma_dias_nascimento", 0) / total
+        idade_media = round(dias_medios / 365.2425, 1)
+
+    # Idade pelo ano e mês de nascimento: quem ainda não chegou ao mês do aniversário
+    # tem um ano a menos; no próprio mês, a pessoa já conta com a idade nova
+    faixas = {}
+    for ano_mes, quantidade in stats.get("por_ano_mes", {}).items():
+        if quantidade <= 0:
+            continue
+        ano, mes = (int(parte) for parte in ano_mes.split("-"))
+        idade = hoje.year - ano - (1 if mes > hoje.month else 0)
+        inicio = idade // FAIXA_ETARIA * FAIXA_ETARIA
+        faixas[inicio] = faixas.get(inicio, 0) + quantidade
+
+    return {
+        "total": total,
+        "aniversarios_por_mes": {f"{mes:02d}": stats.get("por_mes", {}).get(f"{mes:02d}", 0) for mes in range(1, 13)},
+        "idade_media": idade_media,
+        "distribuicao_idade": {f"{inicio}-{inicio + FAIXA_ETARIA - 1}": faixas[inicio] for inicio in sorted(faixas)},
+        "distribuicao_idade_base": "ano e mês de nascimento (no mês do aniversário já conta a nova idade)"
+    }
+
+def obter_stats():
+    """Lê o documento de estatísticas (reconstrói se não existir ou for de outra versão)"""
+    stats = get_db()[STATS_COLLECTION].find_one({"_id": STATS_ID})
+    if stats is None or stats.get("versao") != STATS_VERSAO:
+        stats = reconstruir_stats()
+    return formatar_stats(stats)
+
+# 🔹 Exportação de usuários em streaming
+class BufferStreaming:
+    """Arquivo em memória que é esvaziado a cada bloco enviado ao cliente"""
+    def __init__(self):
+        self.blocos = []
+
+    def write(self, dados):
+        self.blocos.append(bytes(dados))
+        return len(dados)
+
+    def esvaziar(self):
+        dados = b"".join(self.blocos)
+        self.blocos = []
+        return dados
+
+def esvaziar_csv(buffer):
+    """Retorna o texto acumulado no StringIO e o reinicia"""
+    texto = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return texto
+
+def cursor_usuarios():
+    """Percorre os usuários em lotes, sem materializar a coleção inteira"""
+    return get_db()["LoqedBirths"].find().sort("_id", 1).batch_size(get_storage().config["EXPORT_BATCH_SIZE"])
+
+def data_iso(valor):
+    """Data/hora em ISO 8601 (UTC), sem a conversão de fuso usada na exibição"""
+    if isinstance(valor, datetime):
+        if valor.tzinfo is None:
+            valor = valor.replace(tzinfo=pytz.utc)
+        return valor.astimezone(pytz.utc).isoformat()
+    return str(valor) if valor is not None else ""
+
+def formatar_usuario_exportacao(user):
+    """Converte um documento do MongoDB em uma linha de exportação"""
+    # A data de nascimento sai exatamente como foi cadastrada (AAAA-MM-DD)
+    nascimento = converter_data_nascimento(user.get("data_nascimento"))
+    return {
+        "id": str(user["_id"]),
+        "nome": user.get("nome", ""),
+        "data_nascimento": nascimento.isoformat() if nascimento else str(user.get("data_nascimento", "")),
+        "imagem": user.get("imagem", ""),
+        "image_id": user.get("image_id", ""),
+        "created_at": data_iso(user.get("created_at")),
+        "updated_at": data_iso(user.get("updated_at"))
+    }
+
+def abrir_imagem_gridfs(image_id):
+    """Abre a imagem no GridFS sem ler o conteúdo (None se não existir)"""
+    try:
+        return get_fs().get(ObjectId(image_id))
+    except (gridfs.errors.NoFile, InvalidId, TypeError):
+        return None
+
+def hash_imagem(image_id):
+    """Calcula o SHA-256 da imagem lendo o GridFS em blocos"""
+    imagem = abrir_imagem_gridfs(image_id)
+    if imagem is None:
+        return ""
+    sha256 = hashlib.sha256()
+    for bloco in iter(lambda: imagem.read(EXPORT_CHUNK_SIZE), b""):
+        sha256.update(bloco)
+    return sha256.hexdigest()
+
+def gerar_linhas_exportacao(formato="ndjson", incluir_hash=False, usuarios=None):
+    """Gera os usuários linha a linha em NDJSON ou CSV (memória constante)"""
+    campos = EXPORT_CAMPOS + (["image_sha256"] if incluir_hash else [])
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=campos, lineterminator="\n")
+
+    # O cabeçalho CSV sai antes da primeira consulta ao banco
+    if formato == "csv":
+        escritor.writeheader()
+        yield esvaziar_csv(buffer)
+
+    for user in usuarios if usuarios is not None else cursor_usuarios():
+        linha = formatar_usuario_exportacao(user)
+        if incluir_hash:
+            linha["image_sha256"] = hash_imagem(linha["image_id"])
+
+        if formato == "csv":
+            escritor.writerow(linha)
+            yield esvaziar_csv(buffer)
+        else:
+            yield json.dumps(linha, ensure_ascii=False) + "\n"
+
+def gerar_arquivo_exportacao(formato="ndjson"):
+    """Gera um .tar em streaming com as imagens e um usuarios.ndjson/.csv no final
+
+    As imagens são enviadas à medida que o cursor avança; as linhas de dados vão para
+    um arquivo temporário (que passa para disco quando cresce) e entram como último
+    membro, já que o tar precisa do tamanho antes do conteúdo.
+    """
+    buffer = BufferStreaming()
+    with tarfile.open(fileobj=buffer, mode="w|") as tar, \
+            tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE) as dados:
+
+        def usuarios_com_imagens():
+            for user in cursor_usuarios():
+                # A imagem é copiada do GridFS em blocos direto para o arquivo
+                imagem = abrir_imagem_gridfs(user.get("image_id"))
+                if imagem is not None:
+                    info = tarfile.TarInfo(f"imagens/{user.get('imagem') or user['image_id'] + '.jpg'}")
+                    info.size = imagem.length
+                    # O pymongo devolve upload_date como UTC sem fuso
+                    info.mtime = calendar.timegm(imagem.upload_date.utctimetuple())
+                    tar.addfile(info, imagem)
+                yield user
+
+        for linha in gerar_linhas_exportacao(formato, usuarios=usuarios_com_imagens()):
+            dados.write(linha.encode("utf-8"))
+            yield buffer.esvaziar()
+
+        info = tarfile.TarInfo(f"usuarios.{formato}")
+        info.size = dados.tell()
+        info.mtime = int(time.time())
+        dados.seek(0)
+        tar.addfile(info, dados)
+    yield buffer.esvaziar()
+
+# 🔹 Aquecimento opcional (por worker, depois do fork)
+def aquecer(storage=None):
+    """Abre a conexão, cria os índices, prepara as estatísticas e dispara o preenchimento do cache"""
+    storage = storage or get_storage()
+    db = storage.db()
+    storage.client().admin.command("ping")
+
+    # Busca por nome (cadastro/atualização) e índices padrão do GridFS
+    db["LoqedBirths"].create_index("nome")
+    db["fs.files"].create_index([("filename", 1), ("uploadDate", 1)])
+    db["fs.chunks"].create_index([("files_id", 1), ("n", 1)], unique=True)
+
+    stats = db[STATS_COLLECTION].find_one({"_id": STATS_ID}, {"versao": 1})
+    if stats is None or stats.get("versao") != STATS_VERSAO:
+        reconstruir_stats()
+
+    # As cópias do GridFS rodam em segundo plano: nem o boot nem o primeiro request esperam
+    if storage.config["WARMUP_IMAGENS"] > 0:
+        threading.Thread(target=preencher_cache_imagens, args=(storage,), name="aquecer-cache", daemon=True).start()
+
+def preencher_cache_imagens(storage):
+    """Copia do GridFS as imagens que ainda não estão no cache (nome usado por /secure_image)"""
+    try:
+        cache_dir = storage.cache_dir()
+        fs = storage.fs()
+        usuarios = storage.db()["LoqedBirths"].find({"image_id": {"$exists": True}}, {"image_id": 1})
+        for user in usuarios.limit(storage.config["WARMUP_IMAGENS"]):
+            cache_path = os.path.join(cache_dir, f"{user['image_id']}.jpg")
+            if os.path.exists(cache_path):
+                continue
+            try:
+                imagem = fs.get(ObjectId(user["image_id"]))
+            except (gridfs.errors.NoFile, InvalidId):
+                continue
+            # Grava em arquivo temporário e renomeia: um request nunca lê imagem pela metade
+            with open(cache_path + ".tmp", "wb") as destino:
+                shutil.copyfileobj(imagem, destino, EXPORT_CHUNK_SIZE)
+            os.replace(cache_path + ".tmp", cache_path)
+    except Exception as e:
+        print(f"Erro ao preencher o cache de imagens: {e}")
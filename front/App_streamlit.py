@@ -38,7 +38,7 @@ validar_acesso()
 st.title("📌 Painel de Gerenciamento de Usuários")
 
 # Criar menu lateral
-aba = st.sidebar.radio("Menu", ["Listar Usuários", "Cadastrar Usuário", "Oráculo"])
+aba = st.sidebar.radio("Menu", ["Listar Usuários", "Cadastrar Usuário", "Estatísticas", "Oráculo"])
 
 # Criar pasta para armazenar imagens temporárias
 if not os.path.exists("temp_images"):
@@ -203,6 +203,30 @@ elif aba == "Cadastrar Usuário":
 
 
 
+# 🔹 Estatísticas
+elif aba == "Estatísticas":
+    st.header("📊 Estatísticas")
+
+    # Agregados pré-calculados no backend, sem baixar a lista de usuários
+    response = requests.get(f"{API_URL}/stats")
+
+    if response.status_code == 200:
+        stats = response.json()
+
+        col1, col2 = st.columns(2)
+        col1.metric("👥 Usuários", stats.get("total", 0))
+        idade_media = stats.get("idade_media")
+        col2.metric("🎂 Idade média", f"{idade_media} anos" if idade_media is not None else "-")
+
+        st.subheader("📅 Aniversários por mês")
+        st.bar_chart(stats.get("aniversarios_por_mes", {}))
+
+        st.subheader("📈 Distribuição de idade")
+        st.bar_chart(stats.get("distribuicao_idade", {}))
+        st.caption(f"Idade calculada por {stats.get('distribuicao_idade_base', 'ano de nascimento')}.")
+    else:
+        st.error("Erro ao buscar estatísticas.")
+
 # 🔹 Oráculo
 elif aba == "Oráculo":
     st.header("🔮 Oráculo - Inteligência de Dados")